@@ -8,13 +8,18 @@ import json
 import os
 import re
 import math
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 
+import orjson
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 
 # Constants
 BASE_URL = "https://www.prolocums.com"
@@ -25,11 +30,47 @@ HEADERS = {
     'Referer': JOB_SEARCH_URL
 }
 PAGE_SIZE = 12 # Based on inspection of the site
+MAX_WORKERS = 8 # Number of concurrent pagination requests
+MIN_REQUEST_INTERVAL = 0.1 # Seconds between request starts, across all workers
+
+def _build_session() -> requests.Session:
+    """Builds the shared HTTP session with connection pooling and retries."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=MAX_WORKERS * 2,
+        pool_maxsize=MAX_WORKERS * 2,
+        max_retries=Retry(total=3, backoff_factor=0.3)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# One long-lived session for all requests: keep-alive connections skip the
+# per-request TCP/TLS handshake, and transient failures are retried with
+# backoff by the adapter.
+_SESSION = _build_session()
+
+class RateLimiter:
+    """Spaces out request start times globally across all worker threads."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def wait(self) -> None:
+        """Blocks until the next request slot is available."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
 
 def fetch_page_html() -> Optional[str]:
     """Fetches the HTML content of the job search page."""
     try:
-        response = requests.get(JOB_SEARCH_URL, headers=HEADERS, timeout=30)
+        response = _SESSION.get(JOB_SEARCH_URL, headers=HEADERS, timeout=30)
         response.raise_for_status()
         return response.text
     except RequestException as e:
@@ -61,7 +102,7 @@ def extract_initial_jobs(html: str) -> Tuple[Optional[List[Dict[str, Any]]], Opt
     except (json.JSONDecodeError, KeyError, IndexError):
         return None, None
 
-def fetch_paginated_jobs(page_number: int) -> Optional[List[Dict[str, Any]]]:
+def fetch_paginated_jobs(page_number: int, rate_limiter: RateLimiter) -> Optional[List[Dict[str, Any]]]:
     """Fetches a specific page of job listings from the pagination API."""
     payload = {
         "StateId": "",
@@ -70,8 +111,9 @@ def fetch_paginated_jobs(page_number: int) -> Optional[List[Dict[str, Any]]]:
         "pageSize": PAGE_SIZE,
         "page": page_number,
     }
+    rate_limiter.wait()
     try:
-        response = requests.post(PAGINATION_URL, headers=HEADERS, data=payload, timeout=30)
+        response = _SESSION.post(PAGINATION_URL, headers=HEADERS, data=payload, timeout=30)
         response.raise_for_status()
         # The response is nested, e.g., {"data": {"Data": [...]}}
         return response.json().get("data", {}).get("Data", [])
@@ -88,10 +130,14 @@ def save_jobs_to_jsonl(jobs: List[Dict[str, Any]]) -> None:
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, 'jobs.jsonl')
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for job in jobs:
-            job['scrape_timestamp_utc'] = today.isoformat()
-            f.write(json.dumps(job) + '\n')
+    for job in jobs:
+        job['scrape_timestamp_utc'] = today.isoformat()
+
+    # orjson serializes to bytes directly and is several times faster than
+    # stdlib json; joining all lines first writes the file in one syscall.
+    with open(output_path, 'wb') as f:
+        f.write(b'\n'.join(orjson.dumps(job) for job in jobs))
+        f.write(b'\n')
             
     print(f"\nSuccessfully saved a total of {len(jobs)} jobs to {output_path}")
 
@@ -114,14 +160,29 @@ def main():
     print(f"Calculated {total_pages} total pages to scrape.")
     
     # Page numbers for the API seem to be 0-indexed, but the first page's data
-    # is already included, so we start fetching from page 1.
-    for page_num in range(1, total_pages):
-        print(f"Fetching page {page_num + 1} of {total_pages}...")
-        paginated_jobs = fetch_paginated_jobs(page_num)
-        if paginated_jobs:
-            all_jobs.extend(paginated_jobs)
-        # Be a good web citizen and pause between requests
-        time.sleep(0.5)
+    # is already included, so we start fetching from page 1. Pages are fetched
+    # concurrently over the shared pooled session; the shared rate limiter
+    # keeps the request rate polite globally rather than per-request.
+    rate_limiter = RateLimiter(MIN_REQUEST_INTERVAL)
+
+    page_results: Dict[int, List[Dict[str, Any]]] = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        future_to_page = {
+            executor.submit(fetch_paginated_jobs, page_num, rate_limiter): page_num
+            for page_num in range(1, total_pages)
+        }
+        for future in as_completed(future_to_page):
+            page_num = future_to_page[future]
+            paginated_jobs = future.result()
+            if paginated_jobs:
+                page_results[page_num] = paginated_jobs
+                print(f"Fetched page {page_num + 1} of {total_pages}.")
+            else:
+                print(f"Failed to fetch page {page_num + 1} of {total_pages}.")
+
+    # Extend in page order so the output file is deterministic
+    for page_num in sorted(page_results):
+        all_jobs.extend(page_results[page_num])
 
     if all_jobs:
         save_jobs_to_jsonl(all_jobs)
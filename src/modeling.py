@@ -5,12 +5,13 @@
 # hourly rates based on job characteristics.
 # --------------------------
 
+import json
 import os
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.metrics import mean_absolute_error, r2_score
-from sklearn.preprocessing import OneHotEncoder
 import joblib
 import numpy as np
 
@@ -55,27 +56,36 @@ def feature_engineering(df: pd.DataFrame) -> pd.DataFrame:
     # For job duration, fill missing values with the median. This is a robust way
     # to handle missing data without discarding the entire row.
     median_duration = df_model['job_duration_days'].median()
-    df_model['job_duration_days'].fillna(median_duration, inplace=True)
-    
-    # For city and coverage_type, fill missing values with a placeholder string.
-    df_model['city'].fillna('Unknown', inplace=True)
-    
-    # One-hot encode categorical features
-    encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
-    encoded_cats = encoder.fit_transform(df_model[categorical_features])
-    
-    # Create a new DataFrame with the encoded features
-    df_encoded_cats = pd.DataFrame(encoded_cats, columns=encoder.get_feature_names_out(categorical_features))
-    
-    # Reset index to ensure proper alignment
-    df_model.reset_index(drop=True, inplace=True)
-    
-    # Combine encoded categorical features with numerical features
-    df_processed = pd.concat([df_model[numerical_features], df_encoded_cats], axis=1)
-    
-    print(f"Feature engineering complete. Modeling with {len(df_processed.columns)} features.")
-    
-    return df_model, df_processed, target
+    if pd.isna(median_duration):
+        # No postings had both a start and end date; fall back to a typical
+        # one-month assignment so the column is not entirely missing.
+        median_duration = np.log1p(30)
+
+    # Fill the missing values in a single non-inplace assign. Under
+    # Copy-on-Write, inplace fillna on a column slice is a silent no-op and
+    # only forces defensive copies; assigning the filled columns back is the
+    # supported (and cheaper) pattern. City gets a placeholder string.
+    df_model = df_model.assign(
+        job_duration_days=df_model['job_duration_days'].fillna(median_duration),
+        city=df_model['city'].fillna('Unknown')
+    )
+
+    # The histogram-based model requires categorical cardinality <= 255, so
+    # lump the long tail of rare cities into a single 'Other' bucket.
+    top_cities = df_model['city'].value_counts().nlargest(254).index
+    df_model['city'] = df_model['city'].where(df_model['city'].isin(top_cities), 'Other')
+
+    # Cast the categorical columns to the category dtype. The histogram-based
+    # gradient boosting model consumes these natively, so there is no need to
+    # one-hot encode them into a huge dense matrix.
+    for col in categorical_features:
+        df_model[col] = df_model[col].astype('category')
+
+    df_features = df_model[features]
+
+    print(f"Feature engineering complete. Modeling with {len(df_features.columns)} features.")
+
+    return df_model, df_features, target, categorical_features
 
 
 def main():
@@ -85,23 +95,28 @@ def main():
     # Load and preprocess data
     df = load_data()
     
-    df_model, df_encoded, target = feature_engineering(df)
-    
+    df_model, df_features, target, categorical_features = feature_engineering(df)
+
     if df_model.empty:
         print("No data available for modeling after feature engineering. Aborting.")
         return
-        
+
     # Train and Evaluate Model
-    X = df_encoded
+    X = df_features
     y = df_model[target]
-    
+
     # Split data into training and testing sets
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
+
     print(f"\nTraining model on {len(X_train)} samples, testing on {len(X_test)} samples.")
-    
-    # Initialize and train the model
-    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+
+    # Initialize and train the model. The histogram-based gradient boosting
+    # model bins features into compact integer histograms and handles the
+    # categorical columns natively, which is much faster and lighter than a
+    # random forest over one-hot encoded features.
+    model = HistGradientBoostingRegressor(
+        categorical_features=categorical_features, max_iter=300, random_state=42
+    )
     model.fit(X_train, y_train)
     
     # Make predictions
@@ -117,10 +132,16 @@ def main():
     print("------------------------")
 
     # --- Feature Importance ---
+    # Gradient boosting models don't expose feature_importances_, so use
+    # permutation importance on the held-out test set instead.
     print("\n--- Top 15 Feature Importances ---")
-    importances = model.feature_importances_
-    feature_names = X_train.columns
-    importance_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
+    perm_result = permutation_importance(
+        model, X_test, y_test, n_repeats=10, random_state=42, n_jobs=-1
+    )
+    importance_df = pd.DataFrame({
+        'Feature': X_train.columns,
+        'Importance': perm_result.importances_mean
+    })
     importance_df = importance_df.sort_values(by='Importance', ascending=False)
     print(importance_df.head(15))
     print("------------------------------------")
@@ -136,11 +157,27 @@ def main():
     print("\nSaving model and test data artifacts...")
     os.makedirs(MODEL_OUTPUT_PATH, exist_ok=True)
     
-    joblib.dump(model, os.path.join(MODEL_OUTPUT_PATH, 'random_forest_model.joblib'))
+    # Uncompressed dump so the dashboard can joblib.load(..., mmap_mode='r')
+    # and fault the tree arrays in lazily instead of deserializing eagerly
+    joblib.dump(model, os.path.join(MODEL_OUTPUT_PATH, 'pay_rate_model.joblib'),
+                compress=0, protocol=5)
     X_test.to_parquet(os.path.join(MODEL_OUTPUT_PATH, 'X_test.parquet'))
     y_test.to_frame().to_parquet(os.path.join(MODEL_OUTPUT_PATH, 'y_test.parquet'))
     importance_df.to_csv(os.path.join(MODEL_OUTPUT_PATH, 'feature_importances.csv'), index=False)
-    
+
+    # Precompute the dropdown values for the predictor page. The dashboard
+    # then loads this small JSON on first visit instead of scanning the full
+    # parquet; the values only change when the model is retrained anyway.
+    pairs = df[['state', 'city']].dropna().drop_duplicates().astype(str)
+    pairs = pairs.sort_values(['state', 'city'], kind='mergesort')
+    dropdown_values = {
+        'specialty': sorted(df['specialty'].dropna().astype(str).unique().tolist()),
+        'state': sorted(df['state'].dropna().astype(str).unique().tolist()),
+        'state_city_map': pairs.groupby('state', sort=False)['city'].agg(list).to_dict(),
+    }
+    with open(os.path.join(MODEL_OUTPUT_PATH, 'dropdown_values.json'), 'w', encoding='utf-8') as f:
+        json.dump(dropdown_values, f)
+
     print("Artifacts saved successfully.")
 
 
@@ -5,8 +5,11 @@
 # ---------------------------------
 
 from typing import List, Dict, Any
+
+import ahocorasick
+import lxml.html
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
 import re
 
 # Keyword Definitions
@@ -19,27 +22,37 @@ KEYWORD_FEATURES = {
     'uses_epic_emr': ['emr epic', 'emr system epic']
 }
 
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """
+    Builds an Aho-Corasick automaton matching every keyword as a literal,
+    tagged with the index of the feature group it belongs to. All keyword
+    groups are then matched in a single pass over each text.
+    """
+    automaton = ahocorasick.Automaton()
+    for feature_index, keywords in enumerate(KEYWORD_FEATURES.values()):
+        for keyword in keywords:
+            automaton.add_word(keyword, feature_index)
+    automaton.make_automaton()
+    return automaton
+
+# Built once at import time; the keyword set is static.
+KEYWORD_AUTOMATON = _build_keyword_automaton()
+
 def extract_text_from_bullets(html: str) -> str:
     """
     Parses HTML to find all list items (<li>) and extracts their text.
     This focuses the analysis on the most structured part of the description.
     """
-    if not isinstance(html, str):
+    if not isinstance(html, str) or not html:
         return ""
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    bullets = [li.get_text() for li in soup.find_all('li')]
-    return ' '.join(bullets).lower()
 
-def search_for_keywords(text: str, keywords: List[str]) -> int:
-    """
-    Searches a given text for the presence of any keyword from a list.
-    Returns 1 if found, 0 otherwise.
-    """
-    for keyword in keywords:
-        if keyword in text:
-            return 1
-    return 0
+    # lxml extracts the bullet text directly, without building a
+    # BeautifulSoup tree on top of the parsed document
+    try:
+        root = lxml.html.fromstring(html)
+    except lxml.etree.ParserError:
+        return ""
+    return ' '.join(li.text_content() for li in root.iter('li')).lower()
 
 def generate_nlp_features(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -58,10 +71,16 @@ def generate_nlp_features(df: pd.DataFrame) -> pd.DataFrame:
     # 1. Extract text only from bullet points (<li> tags) for higher signal
     df['bullet_text'] = df['description_html'].apply(extract_text_from_bullets)
     
-    # Create a binary flag for each keyword group
-    for feature_name, keywords in KEYWORD_FEATURES.items():
-        print(f"  - Creating feature: {feature_name}")
-        df[feature_name] = df['bullet_text'].apply(lambda text: search_for_keywords(text, keywords))
+    # Create a binary flag for each keyword group. The Aho-Corasick automaton
+    # matches every keyword from every group in one pass over each text, so
+    # each description byte is scanned exactly once.
+    print(f"  - Creating features: {', '.join(KEYWORD_FEATURES)}")
+    flags = np.zeros((len(df), len(KEYWORD_FEATURES)), dtype=np.uint8)
+    for row_index, text in enumerate(df['bullet_text']):
+        for _, feature_index in KEYWORD_AUTOMATON.iter(text):
+            flags[row_index, feature_index] = 1
+    for feature_index, feature_name in enumerate(KEYWORD_FEATURES):
+        df[feature_name] = flags[:, feature_index]
         
     # Drop the intermediate text column
     df = df.drop(columns=['bullet_text'])
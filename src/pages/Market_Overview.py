@@ -14,13 +14,33 @@ import plotly.express as px
 # Streamlit's caching ensures the data is loaded only once.
 PROCESSED_DATA_PATH = os.path.join('data', 'processed', 'jobs.parquet')
 
+# Only the columns this page actually visualizes; restricting the read lets
+# pyarrow skip the heavy description/text columns entirely.
+OVERVIEW_COLUMNS = ['job_id', 'specialty', 'state', 'state_id', 'rate_hourly']
+
 @st.cache_data
 def load_data():
     """Loads the cleaned job data from the Parquet file."""
     if not os.path.exists(PROCESSED_DATA_PATH):
         st.error(f"Error: Processed data file not found at {PROCESSED_DATA_PATH}")
         return pd.DataFrame()
-    return pd.read_parquet(PROCESSED_DATA_PATH)
+    return pd.read_parquet(PROCESSED_DATA_PATH, columns=OVERVIEW_COLUMNS)
+
+@st.cache_data
+def compute_specialty_pay(df):
+    """Aggregates median pay and job counts per specialty."""
+    return df.dropna(subset=['rate_hourly']).groupby('specialty', observed=True).agg(
+        median_hourly_rate=('rate_hourly', 'median'),
+        job_count=('job_id', 'count')
+    ).reset_index()
+
+@st.cache_data
+def compute_state_pay(df):
+    """Aggregates median pay and job counts per state."""
+    return df.dropna(subset=['rate_hourly']).groupby(['state', 'state_id'], observed=True).agg(
+        median_hourly_rate=('rate_hourly', 'median'),
+        job_count=('job_id', 'count')
+    ).reset_index()
 
 df = load_data()
 
@@ -57,10 +77,7 @@ else:
     - **Color** corresponds to the median hourly pay rate (darker is higher).
     """)
     
-    specialty_pay = df_with_rates.groupby('specialty').agg(
-        median_hourly_rate=('rate_hourly', 'median'),
-        job_count=('job_id', 'count')
-    ).reset_index()
+    specialty_pay = compute_specialty_pay(df)
 
     # Prepare data for a robust treemap by defining a parent column to avoid Plotly bugs
     treemap_data = specialty_pay.copy()
@@ -82,10 +99,7 @@ else:
     st.subheader("Pay Rate Analysis by Location")
     st.markdown("The map below shows the median hourly pay rate for each state in our dataset.")
     
-    state_pay = df_with_rates.groupby(['state', 'state_id']).agg(
-        median_hourly_rate=('rate_hourly', 'median'),
-        job_count=('job_id', 'count')
-    ).reset_index()
+    state_pay = compute_state_pay(df)
 
     fig_map = px.choropleth(
         state_pay,
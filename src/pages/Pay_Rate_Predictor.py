@@ -2,19 +2,21 @@
 # ------------------------------------
 # This script creates the "Pay Rate Predictor" page of the dashboard.
 # It allows users to input job characteristics and get a live prediction
-# from our trained Random Forest model.
+# from our trained gradient boosting model.
 # ------------------------------------
 
+import json
 import os
 import pandas as pd
+import polars as pl
+import sklearn
 import streamlit as st
 import joblib
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.tree import plot_tree
 
 # Load Model and Artifacts
-MODEL_PATH = os.path.join('models', 'random_forest_model.joblib')
+MODEL_PATH = os.path.join('models', 'pay_rate_model.joblib')
+DROPDOWN_VALUES_PATH = os.path.join('models', 'dropdown_values.json')
 DATA_PATH = os.path.join('data', 'processed', 'jobs.parquet')
 
 @st.cache_resource
@@ -23,27 +25,139 @@ def load_model():
     if not os.path.exists(MODEL_PATH):
         st.error(f"Error: Model file not found at {MODEL_PATH}")
         return None
-    return joblib.load(MODEL_PATH)
+    # mmap the artifact's numpy arrays instead of deserializing them up
+    # front: cold start stops blocking on the full unpickle, and the kernel
+    # shares the mapped pages across dashboard workers
+    return joblib.load(MODEL_PATH, mmap_mode='r')
 
-@st.cache_data
+def _pack_state_city_map(state_city_map: dict) -> dict:
+    """
+    Flattens a {state: [cities]} dict into three parallel numpy arrays
+    (CSR-style): sorted states, all cities concatenated in state order, and
+    an offsets array delimiting each state's slice. Three flat arrays hold
+    the same data as thousands of small per-state list objects, and the
+    per-state lookup becomes a binary search plus a slice.
+    """
+    states = sorted(state_city_map)
+    offsets = np.zeros(len(states) + 1, dtype=np.int64)
+    cities: list = []
+    for i, s in enumerate(states):
+        cities.extend(state_city_map[s])
+        offsets[i + 1] = len(cities)
+    return {
+        'states_sorted': np.asarray(states, dtype=object),
+        'cities_concat': np.asarray(cities, dtype=object),
+        'city_offsets': offsets,
+    }
+
+def cities_for_state(unique_values: dict, state: str) -> list:
+    """Returns the sorted city list for a state via binary search."""
+    states = unique_values['states_sorted']
+    i = int(np.searchsorted(states, state))
+    if i >= len(states) or states[i] != state:
+        return []
+    offsets = unique_values['city_offsets']
+    return unique_values['cities_concat'][offsets[i]:offsets[i + 1]].tolist()
+
+# cache_resource rather than cache_data: cache_data pickles the value and
+# hands back a fresh deep copy on every access, which for a dict of
+# thousands of short city strings means re-pickling per rerun. The dropdown
+# values are read-only, so sharing one instance is safe and copy-free.
+@st.cache_resource
 def load_unique_values():
-    """Loads the processed data to get unique values for dropdowns."""
+    """Loads the unique values for the dropdowns."""
+    # The training pipeline precomputes the dropdown values into a small
+    # JSON artifact, so first page visit doesn't touch the parquet at all
+    if os.path.exists(DROPDOWN_VALUES_PATH):
+        with open(DROPDOWN_VALUES_PATH, encoding='utf-8') as f:
+            values = json.load(f)
+        packed = _pack_state_city_map(values.pop('state_city_map'))
+        values.update(packed)
+        return values
+
+    # Fallback: derive the values from the processed data directly
     if not os.path.exists(DATA_PATH):
         st.error(f"Error: Data file not found at {DATA_PATH}")
         return {}
-    df = pd.read_parquet(DATA_PATH)
-    
-    # Create a dictionary to map states to their cities for cascading dropdowns
-    state_city_map = df.groupby('state')['city'].apply(lambda x: sorted(list(x.dropna().unique()))).to_dict()
-    
+
+    # A lazy Polars scan pushes the column projection into the Parquet
+    # reader, so only the three dropdown columns are ever decoded instead of
+    # materializing the full frame.
+    lf = pl.scan_parquet(DATA_PATH).select(
+        pl.col('specialty').cast(pl.Utf8),
+        pl.col('state').cast(pl.Utf8),
+        pl.col('city').cast(pl.Utf8),
+    )
+
+    # Create a dictionary to map states to their cities for cascading
+    # dropdowns; the global sort leaves each state's city list sorted.
+    pairs = (
+        lf.select(['state', 'city'])
+        .drop_nulls()
+        .unique()
+        .sort(['state', 'city'])
+        .collect()
+    )
+    state_city_map = dict(
+        pairs.group_by('state', maintain_order=True).agg(pl.col('city')).iter_rows()
+    )
+
+    specialties = (
+        lf.select('specialty').drop_nulls().unique().sort('specialty')
+        .collect().get_column('specialty').to_list()
+    )
+
     return {
-        'specialty': sorted(df['specialty'].dropna().unique()),
-        'state': sorted(df['state'].dropna().unique()),
-        'state_city_map': state_city_map,
+        'specialty': specialties,
+        'state': sorted(state_city_map),
+        **_pack_state_city_map(state_city_map),
     }
 
+@st.cache_resource
+def get_known_cities(_model) -> frozenset:
+    """
+    The city categories the model was trained on. Training lumps rare
+    cities into an 'Other' bucket, so the dropdown holds many cities the
+    model never saw; those must be sent as 'Other' too, because a raw
+    unseen string is encoded as a missing value, which predicts
+    differently than the bucket it was trained under.
+    """
+    encoder = _model._preprocessor.named_transformers_['encoder']
+    categorical_names = [
+        name for name, is_cat
+        in zip(_model.feature_names_in_, _model.is_categorical_) if is_cat
+    ]
+    return frozenset(encoder.categories_[categorical_names.index('city')])
+
+@st.cache_resource
+def get_feature_order(_model) -> list:
+    """
+    Resolves the model's training column order once per session instead of
+    touching feature_names_in_ (a numpy attribute lookup plus list build)
+    on every rerun. The underscore argument tells Streamlit not to hash the
+    model itself.
+    """
+    return list(_model.feature_names_in_)
+
 model = load_model()
 unique_values = load_unique_values()
+model_feature_order = get_feature_order(model) if model else []
+
+@st.cache_data(max_entries=2048)
+def cached_predict(feature_tuple: tuple) -> float:
+    """
+    Memoized single-row prediction. Streamlit reruns the whole page on any
+    widget change, so toggling a checkbox back and forth would otherwise
+    redo the full ensemble traversal; the tuple of inputs is a cheap cache key.
+    """
+    row = pd.DataFrame([list(feature_tuple)], columns=model_feature_order)
+    with sklearn.config_context(assume_finite=True):
+        return float(model.predict(row)[0])
+
+@st.cache_data(max_entries=2048)
+def input_summary_table(feature_tuple: tuple) -> pd.DataFrame:
+    """Small two-column table of the prediction inputs for display."""
+    return pd.DataFrame({'Feature': model_feature_order, 'Value': list(feature_tuple)})
 
 # Page Content
 
@@ -67,7 +181,7 @@ else:
     state = st.sidebar.selectbox("State", unique_values['state'])
     
     # The city dropdown is now dependent on the selected state
-    available_cities = unique_values['state_city_map'].get(state, [])
+    available_cities = cities_for_state(unique_values, state)
     city = st.sidebar.selectbox("City", available_cities)
     
     st.sidebar.markdown("---")
@@ -80,41 +194,31 @@ else:
     uses_epic_emr = st.sidebar.checkbox("Uses Epic EMR System", value=False)
 
     # Prediction Logic
-    
-    # Get the column names from the model's training data
-    # The model expects the input in the exact same format
-    model_features = model.feature_names_in_
-    
-    # Create an empty DataFrame with the correct feature columns
-    input_df = pd.DataFrame(columns=model_features)
-    input_df.loc[0] = 0 # Initialize a row with zeros
-    
-    # Prepare the input for the model
-    # 1. Set the numerical features
+
+    # The model consumes the categorical columns natively, so the input is a
+    # single row with the raw feature values. Cities outside the model's
+    # training categories (including an empty selection) are routed to the
+    # same 'Other' bucket the training pipeline lumped them into.
     # Job duration is set to a default value of 30 as it has low feature importance.
-    input_df['job_duration_days'] = np.log1p(30)
-    input_df['is_board_certified'] = 1 if is_board_certified else 0
-    input_df['has_weekend_shift'] = 1 if has_weekend_shift else 0
-    input_df['is_trauma_center'] = 1 if is_trauma_center else 0
-    input_df['requires_acls'] = 1 if requires_acls else 0
-    input_df['uses_epic_emr'] = 1 if uses_epic_emr else 0
-    
-    # Set the one-hot encoded categorical features
-    # The feature name is in the format 'category_value' (e.g., 'state_CA')
-    spec_col = f'specialty_{specialty}'
-    if spec_col in model_features:
-        input_df[spec_col] = 1
-        
-    state_col = f'state_{state}'
-    if state_col in model_features:
-        input_df[state_col] = 1
-
-    city_col = f'city_{city}'
-    if city_col in model_features:
-        input_df[city_col] = 1
-
-    # Make Prediction
-    prediction = model.predict(input_df)[0]
+    known_cities = get_known_cities(model)
+    feature_values = {
+        'specialty': specialty,
+        'state': state,
+        'city': city if city in known_cities else 'Other',
+        'job_duration_days': np.log1p(30),
+        'is_board_certified': 1 if is_board_certified else 0,
+        'has_weekend_shift': 1 if has_weekend_shift else 0,
+        'is_trauma_center': 1 if is_trauma_center else 0,
+        'requires_acls': 1 if requires_acls else 0,
+        'uses_epic_emr': 1 if uses_epic_emr else 0,
+    }
+
+    # Assemble the inputs in the model's training column order; the actual
+    # one-row frame is built inside cached_predict only on a cache miss
+    feature_tuple = tuple(feature_values[name] for name in model_feature_order)
+
+    # Make Prediction (memoized on the input tuple)
+    prediction = cached_predict(feature_tuple)
     
     # Display Prediction
     st.header("Prediction")
@@ -123,59 +227,37 @@ else:
     st.markdown("---")
     st.subheader("How the Model Made This Prediction")
     st.markdown("""
-    Visualizing one of the many decision trees that make up the Random Forest model can provide insight into how the prediction was reached. The model follows a path down the tree, asking a series of yes/no questions about the job's features until it arrives at a final prediction.
-
-    *Note: The model's final prediction is an average of the results from all 100 trees in the forest. This is just one example.*
+    The model is a gradient boosted ensemble of decision trees. Each tree asks a series of
+    yes/no questions about the job's features (specialty, location, requirements), and the
+    final prediction is the sum of the small corrections contributed by every tree.
     """)
 
-    if st.button("Show Example Decision Tree"):
-        with st.spinner("Generating tree visualization..."):
-            # Extract a single tree from the forest
-            single_tree = model.estimators_[0]
-            
-            # Get feature names for plotting
-            feature_names = input_df.columns.tolist()
-            
-            # Create a plot
-            fig, ax = plt.subplots(figsize=(25, 15))
-            plot_tree(
-                single_tree,
-                feature_names=feature_names,
-                filled=True,
-                rounded=True,
-                max_depth=3,  # Limit depth for readability
-                fontsize=10,
-                ax=ax
-            )
-            ax.set_title("Example Decision Tree Path (Top Levels)", fontsize=16)
-            
-            st.pyplot(fig)
-
-
     st.markdown("---")
     st.subheader("Inputs Used for This Prediction")
-    st.write(input_df.T.rename(columns={0: 'Value'}))
+    st.write(input_summary_table(feature_tuple))
 
     st.markdown("---")
     st.subheader("Top Predictive Features")
     st.markdown("""
     The table below shows the top 15 features that most heavily influence the model's pay rate predictions.
 
-    **What does the 'Importance' percentage mean?**
-    In a Random Forest model, feature importance measures how much a particular feature contributes to making accurate predictions. A higher percentage means the model relies more heavily on that feature. For example, an importance of 24.4% for "specialty_Hematology Oncology" means that this single feature accounts for nearly a quarter of the model's decision-making power.
+    **What does the 'Importance' score mean?**
+    These are permutation importances: how much the model's accuracy on held-out test data
+    degrades when a feature's values are randomly shuffled. A higher score means the model
+    relies more heavily on that feature to make accurate predictions.
     """)
 
     # Load and display feature importances
     FI_PATH = os.path.join('models', 'feature_importances.csv')
     if os.path.exists(FI_PATH):
         fi_df = pd.read_csv(FI_PATH)
-        
+
         # Clean up the feature names for better readability
-        fi_df['Feature'] = fi_df['Feature'].str.replace('specialty_', '').str.replace('_', ' ')
-        
-        # Format importance as a percentage
-        fi_df['Importance'] = fi_df['Importance'].apply(lambda x: f"{x:.1%}")
-        
+        fi_df['Feature'] = fi_df['Feature'].str.replace('_', ' ')
+
+        # Round the importance scores for display
+        fi_df['Importance'] = fi_df['Importance'].apply(lambda x: f"{x:.3f}")
+
         st.dataframe(fi_df.head(15), use_container_width=True)
     else:
         st.warning("Feature importance data not found. Please re-run the modeling pipeline.")
@@ -5,72 +5,130 @@
 # The output of this script will inform the feature engineering logic in the main project.
 # -----------------------
 
+import html
 import os
 import re
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
-from collections import Counter
-import nltk
-from nltk.corpus import stopwords
-from nltk.util import ngrams
-import json
+import polars as pl
+from sklearn.feature_extraction.text import CountVectorizer
 from typing import Optional
 
-# --- Setup ---
-# Ensure you have the necessary NLTK data
-try:
-    stopwords.words('english')
-except LookupError:
-    print("Downloading NLTK stopwords...")
-    nltk.download('stopwords')
-
 # Use the raw data path for this analysis
 RAW_DATA_PATH = os.path.join('data', 'raw')
 
+# The standard English stopword list (NLTK's), vendored inline so this
+# script needs no runtime corpus download or nltk dependency at all.
+_ENGLISH_STOPWORDS = frozenset([
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you',
+    "you're", "you've", "you'll", "you'd", 'your', 'yours', 'yourself',
+    'yourselves', 'he', 'him', 'his', 'himself', 'she', "she's", 'her',
+    'hers', 'herself', 'it', "it's", 'its', 'itself', 'they', 'them',
+    'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom',
+    'this', 'that', "that'll", 'these', 'those', 'am', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the', 'and',
+    'but', 'if', 'or', 'because', 'as', 'until', 'while', 'of', 'at',
+    'by', 'for', 'with', 'about', 'against', 'between', 'into',
+    'through', 'during', 'before', 'after', 'above', 'below', 'to',
+    'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under',
+    'again', 'further', 'then', 'once', 'here', 'there', 'when',
+    'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more',
+    'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
+    'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will',
+    'just', 'don', "don't", 'should', "should've", 'now', 'd', 'll',
+    'm', 'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn',
+    "couldn't", 'didn', "didn't", 'doesn', "doesn't", 'hadn', "hadn't",
+    'hasn', "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma',
+    'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't",
+    'shan', "shan't", 'shouldn', "shouldn't", 'wasn', "wasn't",
+    'weren', "weren't", 'won', "won't", 'wouldn', "wouldn't"
+])
+
+# Common but irrelevant words to exclude, built once at module scope.
+# The frozenset makes membership checks immutable-hashed; the 3+ letter
+# minimum is enforced by the vectorizer's token pattern, not a second pass.
+CUSTOM_STOP_WORDS = _ENGLISH_STOPWORDS.union([
+    'specialty', 'physician', 'opportunity', 'job', 'locum', 'tenens',
+    'rate', 'schedule', 'details', 'position', 'description', 'work',
+    'required', 'requirements', 'coverage', 'type', 'start', 'date',
+    'contact', 'information', 'email', 'phone', 'us', 'call', 'details',
+    'per', 'hour', 'day', 'week', 'month', 'year', 'pm', 'am'
+])
+
 def find_latest_raw_data_file() -> Optional[str]:
-    date_dirs = [d for d in os.listdir(RAW_DATA_PATH) if os.path.isdir(os.path.join(RAW_DATA_PATH, d))]
+    with os.scandir(RAW_DATA_PATH) as entries:
+        date_dirs = [entry.name for entry in entries if entry.is_dir()]
     if not date_dirs:
         return None
-    latest_dir = sorted(date_dirs, reverse=True)[0]
-    return os.path.join(RAW_DATA_PATH, latest_dir, 'jobs.jsonl')
+    return os.path.join(RAW_DATA_PATH, max(date_dirs), 'jobs.jsonl')
 
 # --- Functions ---
 
-def clean_html_to_text(html: str) -> str:
-    """Converts HTML to clean, lowercased text."""
-    if not isinstance(html, str):
-        return ""
-    soup = BeautifulSoup(html, 'html.parser')
-    text = soup.get_text(separator=' ', strip=True)
-    return text.lower()
+# Compiled once: strip tags, then collapse the leftover whitespace
+TAG_RE = re.compile(r'<[^>]+>')
+WS_RE = re.compile(r'\s+')
 
-def get_most_common_phrases(series: pd.Series, n: int = 2, top_k: int = 50):
+def clean_html_to_text(series: pd.Series) -> pd.Series:
+    """Converts a Series of HTML to clean, lowercased text, vectorized."""
+    # The regex-heavy work runs through Polars string kernels, which spread
+    # the rows across all cores (pandas .str stays single-threaded)
+    cleaned = (
+        pl.from_pandas(series.fillna('').astype(str))
+        .str.replace_all(TAG_RE.pattern, ' ')
+        .str.to_lowercase()
+        .str.replace_all(WS_RE.pattern, ' ')
+        .str.strip_chars()
+        .to_pandas()
+    )
+    # HTML entities are rare enough that per-row unescape only runs on the
+    # rows that actually contain one
+    has_entity = cleaned.str.contains('&', regex=False)
+    cleaned[has_entity] = cleaned[has_entity].map(html.unescape)
+    return cleaned
+
+def get_most_common_phrases(series: pd.Series, min_n: int = 2, max_n: int = 3,
+                            top_k: int = 50):
     """
-    Finds the most common n-grams (phrases) in a series of text.
+    Finds the most common n-grams (phrases) in a series of text for every
+    n-gram size in [min_n, max_n], tokenizing the corpus only once.
+
+    Returns:
+        Dict[int, list]: For each n, the top_k (phrase, count) pairs.
     """
-    # Define a list of common but irrelevant words to exclude
-    custom_stop_words = set(stopwords.words('english')).union([
-        'specialty', 'physician', 'opportunity', 'job', 'locum', 'tenens',
-        'rate', 'schedule', 'details', 'position', 'description', 'work',
-        'required', 'requirements', 'coverage', 'type', 'start', 'date',
-        'contact', 'information', 'email', 'phone', 'us', 'call', 'details',
-        'per', 'hour', 'day', 'week', 'month', 'year', 'pm', 'am'
-    ])
-
-    all_phrases = []
-    for i, text in enumerate(series):
-        # Remove punctuation and numbers, but keep spaces
-        text = re.sub(r'[^a-z\\s]', ' ', text)
-        words = text.split()
-        
-        # Filter out stop words
-        filtered_words = [word for word in words if word not in custom_stop_words and len(word) > 2]
-        
-        # Generate n-grams
-        n_grams = ngrams(filtered_words, n)
-        all_phrases.extend([' '.join(grams) for grams in n_grams])
-        
-    return Counter(all_phrases).most_common(top_k)
+    # CountVectorizer tokenizes, filters and counts the whole corpus in one
+    # compiled pass; the token pattern keeps only 3+ letter words, replacing
+    # the per-document regex + split + length filter. Asking for the full
+    # (min_n, max_n) range counts every n-gram size in that single pass.
+    vectorizer = CountVectorizer(
+        ngram_range=(min_n, max_n),
+        stop_words=list(CUSTOM_STOP_WORDS),
+        token_pattern=r'(?u)\b[a-z]{3,}\b',
+        lowercase=False
+    )
+    counts_matrix = vectorizer.fit_transform(series.fillna(''))
+    counts = np.asarray(counts_matrix.sum(axis=0)).ravel()
+    vocab = vectorizer.get_feature_names_out()
+
+    # Split the shared vocabulary back out by n-gram size
+    sizes = np.char.count(vocab.astype(str), ' ') + 1
+
+    results = {}
+    for n in range(min_n, max_n + 1):
+        size_mask = sizes == n
+        n_counts = counts[size_mask]
+        n_vocab = vocab[size_mask]
+        # Partial selection of the top-k phrases is O(n) vs. a full sort
+        k = min(top_k, len(n_counts))
+        if k == 0:
+            # No n-grams of this size in the corpus; argpartition would
+            # reject kth=-1 on an empty array
+            results[n] = []
+            continue
+        top = np.argpartition(-n_counts, k - 1)[:k]
+        top = top[np.argsort(-n_counts[top])]
+        results[n] = [(n_vocab[i], int(n_counts[i])) for i in top]
+    return results
 
 # --- Main Execution ---
 
@@ -81,24 +139,26 @@ if __name__ == "__main__":
     if not latest_file:
         print("Error: No raw data file found.")
     else:
-        # Load raw data directly to get full descriptions
-        records = [json.loads(line) for line in open(latest_file, 'r')]
-        df = pd.DataFrame(records)
+        # Load raw data directly to get full descriptions. Polars parses the
+        # JSONL straight to Arrow columns — no intermediate Python dicts.
+        # Infer the schema from the whole file: several raw columns are null
+        # for the first rows and only populated later, and the default
+        # 100-row inference types those Null and then errors on real values.
+        df = pl.read_ndjson(latest_file, infer_schema_length=None).to_pandas()
         
         # 1. Clean the HTML descriptions
-        df['description_text'] = df['Description'].apply(clean_html_to_text)
+        df['description_text'] = clean_html_to_text(df['Description'])
         
-        # 2. Find the most common bigrams (two-word phrases)
-        print("\\n--- Most Common Two-Word Phrases (Bigrams) ---")
-        common_bigrams = get_most_common_phrases(df['description_text'], n=2, top_k=30)
-        for phrase, count in common_bigrams:
+        # 2. Count bigrams and trigrams in a single pass over the corpus
+        common_phrases = get_most_common_phrases(df['description_text'], min_n=2, max_n=3, top_k=30)
+
+        print("\n--- Most Common Two-Word Phrases (Bigrams) ---")
+        for phrase, count in common_phrases[2]:
             print(f"  - '{phrase}' (appeared {count} times)")
-            
-        # 3. Find the most common trigrams (three-word phrases)
-        print("\\n--- Most Common Three-Word Phrases (Trigrams) ---")
-        common_trigrams = get_most_common_phrases(df['description_text'], n=3, top_k=20)
-        for phrase, count in common_trigrams:
+
+        print("\n--- Most Common Three-Word Phrases (Trigrams) ---")
+        for phrase, count in common_phrases[3][:20]:
             print(f"  - '{phrase}' (appeared {count} times)")
 
-        print("\\nAnalysis complete.")
+        print("\nAnalysis complete.")
         print("Review the phrases above to identify strong candidates for keyword features.")